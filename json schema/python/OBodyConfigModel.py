@@ -1,18 +1,30 @@
 import argparse
-import json
+import hashlib
+import re
+import string
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
-from pydantic import BaseModel, ConfigDict, Field, ValidationError
+import orjson
+from pydantic import VERSION, BaseModel, ConfigDict, Field, PrivateAttr, TypeAdapter, ValidationError
+from pydantic.json_schema import GenerateJsonSchema
 from typing import Dict, List, Annotated
 
-type NonEmptyTrimmedString = Annotated[str, Field(pattern=r"^(?=\S)(?=.*\S$).*")]
-type NonEmptyString = Annotated[str, Field(pattern=r"^(?!\s*$).+")]
+from OBodyPatterns import EDITOR_ID, FORMID, NON_EMPTY, NON_EMPTY_TRIMMED, PY_NON_EMPTY_TRIMMED, WHITESPACE
+
+# compiled once at import for the Python-side checks; the Field constraints take the plain strings so pydantic-core keeps
+# its Rust regex engine
+_NON_EMPTY_TRIMMED_RE = re.compile(PY_NON_EMPTY_TRIMMED)
+
+type NonEmptyTrimmedString = Annotated[str, Field(pattern=NON_EMPTY_TRIMMED)]
+type NonEmptyString = Annotated[str, Field(min_length=1, pattern=NON_EMPTY)]
 
 type BSTFile = NonEmptyTrimmedString
 
-type FormID = Annotated[str, Field(pattern=r'^[0-9A-Fa-f]{3,8}$')]
+type FormID = Annotated[str, Field(min_length=3, max_length=8, pattern=FORMID)]
 
-type EditorID = NonEmptyTrimmedString
+type EditorID = Annotated[str, Field(pattern=EDITOR_ID)]
 
 type RaceName = NonEmptyTrimmedString
 
@@ -22,53 +34,64 @@ type NPCName = NonEmptyTrimmedString
 
 type OutfitName = NonEmptyTrimmedString
 
-type npcFormID = Annotated[Dict[BSTFile, Dict[FormID, List[PresetName]]], Field(default={},
+type PluginFormIDs = Dict[BSTFile, List[FormID]]
+
+type PluginNames = List[BSTFile]
+
+type RaceNames = List[RaceName]
+
+type npcFormID = Annotated[Dict[BSTFile, Dict[FormID, List[PresetName]]], Field(default_factory=dict,
                                                                                 description="Here you can set which presets should be applied to specific NPCs by their FormID. The FormID is their unique identifier. Works with modded NPCs!")]
-type npc = Annotated[Dict[NPCName, List[PresetName]], Field(default={},
+type npc = Annotated[Dict[NPCName, List[PresetName]], Field(default_factory=dict,
                                                             description="Same as npcFormID, but you use the NPC names instead of the FormID.")]
-type factionFemale = Annotated[Dict[EditorID, List[PresetName]], Field(default={},
+type factionFemale = Annotated[Dict[EditorID, List[PresetName]], Field(default_factory=dict,
                                                                        description="Here you can set which presets to distribute by faction for female NPCs.")]
 type factionMale = Annotated[
-    Dict[EditorID, List[PresetName]], Field(default={}, description="Same as factionFemale, but for male NPCs.")]
-type npcPluginFemale = Annotated[Dict[BSTFile, List[PresetName]], Field(default={},
+    Dict[EditorID, List[PresetName]], Field(default_factory=dict, description="Same as factionFemale, but for male NPCs.")]
+type npcPluginFemale = Annotated[Dict[BSTFile, List[PresetName]], Field(default_factory=dict,
                                                                         description="Here you can set which presets should be applied to female NPCs from a specific plugin/mod.")]
 type npcPluginMale = Annotated[
-    Dict[BSTFile, List[PresetName]], Field(default={}, description="Same as npcPluginFemale but for male NPCs.")]
-type raceFemale = Annotated[Dict[RaceName, List[PresetName]], Field(default={},
+    Dict[BSTFile, List[PresetName]], Field(default_factory=dict, description="Same as npcPluginFemale but for male NPCs.")]
+type raceFemale = Annotated[Dict[RaceName, List[PresetName]], Field(default_factory=dict,
                                                                     description="Here you can define which presets should be applied to females of certain races. Works with custom races too! ONLY put female body presets here!")]
-type raceMale = Annotated[Dict[RaceName, List[PresetName]], Field(default={},
+type raceMale = Annotated[Dict[RaceName, List[PresetName]], Field(default_factory=dict,
                                                                   description="Same as above, but for males. ONLY put male body presets here (if you don't have any, leave it empty)!")]
-type blacklistedNpcsFormID = Annotated[Dict[BSTFile, List[FormID]], Field(default={},
-                                                                          description="Set which NPCs by their FormID should be ignored by OBody. Works with modded NPCs. Useful if you want modded NPCs to have a custom body you want to handle separately.")]
-type blacklistedOutfitsFromORefitFormID = Annotated[Dict[BSTFile, List[FormID]], Field(default={},
-                                                                                       description="Here you can write outfit FormIDs if you don't want ORefit to be applied to them. Further details and explanation is available further below.")]
-type outfitsForceRefitFormID = Annotated[Dict[BSTFile, List[FormID]], Field(default={},
-                                                                            description="Here you can write outfit FormIDs if you want to force ORefit to be applied to them, in case ORefit can't detect them. Further details and explanation is available further below. You will not need to write anything in this key 99% of the time.")]
-type blacklistedNpcs = Annotated[List[NPCName], Field(default=[],
+type blacklistedNpcsFormID = Annotated[PluginFormIDs, Field(default_factory=dict,
+                                                            description="Set which NPCs by their FormID should be ignored by OBody. Works with modded NPCs. Useful if you want modded NPCs to have a custom body you want to handle separately.")]
+type blacklistedOutfitsFromORefitFormID = Annotated[PluginFormIDs, Field(default_factory=dict,
+                                                                         description="Here you can write outfit FormIDs if you don't want ORefit to be applied to them. Further details and explanation is available further below.")]
+type outfitsForceRefitFormID = Annotated[PluginFormIDs, Field(default_factory=dict,
+                                                              description="Here you can write outfit FormIDs if you want to force ORefit to be applied to them, in case ORefit can't detect them. Further details and explanation is available further below. You will not need to write anything in this key 99% of the time.")]
+type blacklistedNpcs = Annotated[List[NPCName], Field(default_factory=list,
                                                       description="Same as blacklistedNpcsFormID, but you use NPC names instead of the FormID.")]
-type blacklistedNpcsPluginFemale = Annotated[List[BSTFile], Field(default=[],
-                                                                  description="Here you can blacklist all female NPCs from an entire plugin/mod by simply writing the plugin name.")]
+type blacklistedNpcsPluginFemale = Annotated[PluginNames, Field(default_factory=list,
+                                                                description="Here you can blacklist all female NPCs from an entire plugin/mod by simply writing the plugin name.")]
 type blacklistedNpcsPluginMale = Annotated[
-    List[BSTFile], Field(default=[], description="Same as blacklistedNpcsPluginFemale, but for males.")]
+    PluginNames, Field(default_factory=list, description="Same as blacklistedNpcsPluginFemale, but for males.")]
 type blacklistedOutfitsFromORefitPlugin = Annotated[
-    List[BSTFile], Field(default=[], description="Same as blacklistedOutfitsFromORefitFormID, but you use filenames")]
-type blacklistedRacesFemale = Annotated[List[RaceName], Field(default=["ElderRace"],
-                                                              description="Here you can blacklist females of entire races instead of individual NPCs.")]
+    PluginNames, Field(default_factory=list, description="Same as blacklistedOutfitsFromORefitFormID, but you use filenames")]
+type blacklistedRacesFemale = Annotated[RaceNames, Field(default_factory=lambda: ["ElderRace"],
+                                                         description="Here you can blacklist females of entire races instead of individual NPCs.")]
 type blacklistedRacesMale = Annotated[
-    List[RaceName], Field(default=["ElderRace"], description="Same as blacklistedRacesFemale, but for male NPCs.")]
+    RaceNames, Field(default_factory=lambda: ["ElderRace"], description="Same as blacklistedRacesFemale, but for male NPCs.")]
 type blacklistedPresetsFromRandomDistribution = Annotated[List[PresetName], Field(
-    default=["- Zeroed Sliders -", "-Zeroed Sliders-", "Zeroed Sliders", "HIMBO Zero for OBody"],
+    default_factory=lambda: ["- Zeroed Sliders -", "-Zeroed Sliders-", "Zeroed Sliders", "HIMBO Zero for OBody"],
     description="Should be self explanatory. Set the presets you do NOT want OBody to distribute randomly.")]
-type blacklistedOutfitsFromORefit = Annotated[List[OutfitName], Field(default=["LS Force Naked", "OBody Nude 32"],
+type blacklistedOutfitsFromORefit = Annotated[List[OutfitName], Field(default_factory=lambda: ["LS Force Naked", "OBody Nude 32"],
                                                                       description="Same as blacklistedOutfitsFromORefitFormID, but you use outfit names instead of their FormID.")]
-type outfitsForceRefit = Annotated[List[OutfitName], Field(default=[],
+type outfitsForceRefit = Annotated[List[OutfitName], Field(default_factory=list,
                                                            description="Same as outfitsForceRefitFormID, but you use outfit names instead of their FormID.")]
 type blacklistedPresetsShowInOBodyMenu = Annotated[
     bool, Field(default=True, description="Whether you want the blacklisted presets to show in the O menu or not.")]
 
 
+_BLACKLIST_FIELDS = ("blacklistedNpcs", "blacklistedNpcsPluginFemale", "blacklistedNpcsPluginMale", "blacklistedRacesFemale",
+                     "blacklistedRacesMale", "blacklistedOutfitsFromORefit", "blacklistedOutfitsFromORefitPlugin",
+                     "blacklistedPresetsFromRandomDistribution")
+
+
 class OBodyConfigModel(BaseModel):
-    model_config = ConfigDict(extra='forbid', strict=True, regex_engine='python-re', populate_by_name=True)
+    model_config = ConfigDict(extra='forbid', strict=True, populate_by_name=True)
 
     npcFormID: npcFormID
     npc: npc
@@ -92,39 +115,136 @@ class OBodyConfigModel(BaseModel):
     blacklistedPresetsFromRandomDistribution: blacklistedPresetsFromRandomDistribution
     blacklistedPresetsShowInOBodyMenu: blacklistedPresetsShowInOBodyMenu
 
+    # frozenset copies of the blacklist fields for O(1) membership checks, with the list and length they were built from
+    _blacklist_sets: dict[str, tuple[list[str], int, frozenset[str]]] = PrivateAttr(default_factory=dict)
+
+    def is_listed(self, field: str, name: str) -> bool:
+        """Checks ``name`` against the blacklist field ``field`` in O(1).
+
+        The frozenset is built on first use and rebuilt whenever the field holds a different list or its length changed,
+        so assignments, ``model_copy(update=...)`` and appends are picked up. Replacing an item in place is not.
+        """
+        if field not in _BLACKLIST_FIELDS:
+            raise ValueError(f"{field!r} is not a blacklist field")
+        names = self.__dict__.get(field, [])
+        cached = self._blacklist_sets.get(field)
+        if cached is None or cached[0] is not names or cached[1] != len(names):
+            cached = self._blacklist_sets[field] = (names, len(names), frozenset(names))
+        return name in cached[2]
+
+
+class _GenerateJsonSchema(GenerateJsonSchema):
+    # pydantic leaves "default" out for default_factory fields; call the factory so the schema still documents them
+    def default_schema(self, schema):
+        if 'default_factory' in schema and not schema.get('default_factory_takes_data'):
+            schema = {k: v for k, v in schema.items() if k != 'default_factory'} | {'default': schema['default_factory']()}
+        return super().default_schema(schema)
+
+
+# built at import time; shares the model's compiled validator so callers don't pay for schema assembly again
+_ADAPTER = TypeAdapter(OBodyConfigModel)
+validate_json = _ADAPTER.validate_json
+
+
+_VALIDATED: OrderedDict[bytes, OBodyConfigModel] = OrderedDict()
+_VALIDATED_MAX = 8
+_VALIDATED_LOCK = threading.Lock()
+
+
+def validate_json_cached(data: str | bytes) -> OBodyConfigModel:
+    """Like validate_json, but remembers the models of the last few distinct inputs by their blake2b digest.
+
+    Every call with the same input returns the *same* instance, so the result must be treated as read-only: mutating it
+    (e.g. appending to a list) changes what later callers get. To get a changed config, build a new one with
+    ``model_copy(update=...)`` or ``validate_json``. Invalid input is never cached.
+    """
+    # surrogatepass so a lone surrogate still reaches validate_json and fails as a ValidationError
+    key = hashlib.blake2b(data.encode("utf-8", "surrogatepass") if isinstance(data, str) else data,
+                          digest_size=16).digest()
+    with _VALIDATED_LOCK:
+        if (config := _VALIDATED.get(key)) is not None:
+            _VALIDATED.move_to_end(key)
+            return config
+    config = validate_json(data)
+    with _VALIDATED_LOCK:
+        _VALIDATED[key] = config
+        if len(_VALIDATED) > _VALIDATED_MAX:
+            _VALIDATED.popitem(last=False)
+    return config
+
+
+def validate_npcFormID(raw: dict) -> dict[str, dict[str, list[str]]]:
+    """Checks an already parsed npcFormID mapping in one plain loop, skipping pydantic's per-item dispatch.
+
+    Applies the same constraints as the model field and returns ``raw`` unchanged, raising ValueError on the first bad entry.
+    """
+    for plugin, npcs in raw.items():
+        if not isinstance(plugin, str) or not _NON_EMPTY_TRIMMED_RE.fullmatch(plugin):
+            raise ValueError(f"npcFormID: invalid plugin name {plugin!r}")
+        if not isinstance(npcs, dict):
+            raise ValueError(f"npcFormID.{plugin}: expected an object, got {type(npcs).__name__}")
+        for form_id, presets in npcs.items():
+            # same checks as FormID and NonEmptyString, done with str methods. WHITESPACE rather than isspace(), which
+            # also treats \x1c-\x1f as whitespace unlike the model's Rust \S
+            if not isinstance(form_id, str) or not 3 <= len(form_id) <= 8 or form_id.strip(string.hexdigits):
+                raise ValueError(f"npcFormID.{plugin}: invalid FormID {form_id!r}")
+            if not isinstance(presets, list):
+                raise ValueError(f"npcFormID.{plugin}.{form_id}: expected an array, got {type(presets).__name__}")
+            for preset in presets:
+                if not isinstance(preset, str) or not preset.strip(WHITESPACE):
+                    raise ValueError(f"npcFormID.{plugin}.{form_id}: invalid preset name {preset!r}")
+    return raw
+
+
+def _export_schema(using_rapidjson: bool) -> dict:
+    # noinspection PyRedundantParentheses
+    if using_rapidjson:  # rapidjson uses draft 4, so a workaround
+        temp = OBodyConfigModel.model_json_schema(ref_template="#/definitions/{model}",
+                                                  schema_generator=_GenerateJsonSchema)
+        temp["definitions"] = temp.pop("$defs")
+        # draft 4 ignores every sibling of "$ref", so move the reference into allOf to keep descriptions and defaults
+        for definition in temp["definitions"].values():
+            if "$ref" in definition and len(definition) > 1:
+                definition["allOf"] = [{"$ref": definition.pop("$ref")}]
+        return temp
+    return OBodyConfigModel.model_json_schema(schema_generator=_GenerateJsonSchema)  # this creates a draft 2020-12 schema
+
+
+def _schema_digest(using_rapidjson: bool) -> str:
+    # the schema only changes with this file, the shared patterns, the pydantic version or the draft we target
+    digest = hashlib.blake2b(Path(__file__).read_bytes())
+    digest.update(Path(__file__).with_name("OBodyPatterns.py").read_bytes())
+    digest.update(f"{VERSION}:{using_rapidjson}".encode())
+    return digest.hexdigest()
+
 
 def main(using_rapidjson: bool):
-    # src: https://www.nexusmods.com/skyrimspecialedition/articles/4756
-    test_examples: list[str] = [
-        """{"npcFormID":{"Skyrim.esm":{"00013BA3":["Bardmaid"],"00013BA2":["Wench Preset","IA - Demonic","Tasty Temptress - BHUNP Preset (Nude)"]},"Immersive Wenches.esp":{"0403197F":["Petite Mommy"],"0400C3C0":["s4rMs' - Gaia"]}},"npc":{"Mjoll the Lioness":["Hardass Warrior"],"Haelga":["Petite Mommy","IA - Demonic","s4rMs' - Gaia"],"Temba Wide-Arm":["Tasty Temptress - BHUNP Preset (Nude)"]},"factionFemale":{"SolitudeBardsCollegeFaction":["Hardass Warrior","Fantasy Figure - Nude","Royal Battle Maiden - BHUNP"],"TownSolitudeFaction":["QC-The Everywoman"],"CollegeofWinterholdFaction":["Tasty Temptress - BHUNP Preset (Nude)"]},"factionMale":{"CompanionsCircle":["HIMBO Muscled"],"TownWhiterunFaction":["HIMBO Simple"]},"npcPluginFemale":{"Bijin_AIO_Merged.esp":["Hardass warrior","SilverR1baka"],"Skyrim.esm":["Nordic Oppai - BHUNP - Nude"]},"npcPluginMale":{"Dawnguard.esm":["HIMBO Simple"]},"raceFemale":{"NordRace":["QC-The Everywoman","D*sney Mommy NG","Fantasy Figure - Nude"],"OrcRace":["Hardass warrior"],"WoodElfRace":["-Zeroed Sliders-"]},"raceMale":{"NordRace":["HIMBO Simple"],"BretonRace":["HIMBO Simple"]},"blacklistedNpcs":["Saffir","Vilja","Lydia"],"blacklistedNpcsFormID":{"Skyrim.esm":["00013BB8","00013BBD"],"CS_Vayne.esp":["0400083D","0402CC59"]},"blacklistedNpcsPluginFemale":["CS_Coralyn.esp","3DNPC.esp","Hearthfires.esm"],"blacklistedNpcsPluginMale":["Immersive Wenches.esp","018Auri.esp"],"blacklistedRacesFemale":["ElderRace","ArgonianRace"],"blacklistedRacesMale":["ElderRace","DarkElfRace"],"blacklistedOutfitsFromORefitFormID":{"[full_inu] Queen Marika's Dress.esp":["FE000817"]},"blacklistedOutfitsFromORefit":["Demon Hunter's Clothes Light","White Sexy Top Ouvert","Wrap Around Dress (Slutty) - 14"],"blacklistedOutfitsFromORefitPlugin":["[COCO] Mysterious Mage.esp"],"outfitsForceRefitFormID":{"[full_inu] Queen Marika's Dress.esp":["FE000803"]},"outfitsForceRefit":["Demon Hunter's Lingerie Light","Demon Hunter's Lingerie Heavy"],"blacklistedPresetsFromRandomDistribution":["- Zeroed Sliders -","-Zeroed Sliders-","Zeroed Sliders","s4mRs'' - Juno","Royal Battlemaiden - BHUNP"],"blacklistedPresetsShowInOBodyMenu":true}""",
-        """{"npcFormID":{},"npc":{},"factionFemale":{},"factionMale":{},"npcPluginFemale":{},"npcPluginMale":{},"raceFemale":{},"raceMale":{},"blacklistedNpcs":[],"blacklistedNpcsFormID":{},"blacklistedNpcsPluginFemale":[],"blacklistedNpcsPluginMale":[],"blacklistedRacesFemale":["ElderRace"],"blacklistedRacesMale":["ElderRace"],"blacklistedOutfitsFromORefitFormID":{},"blacklistedOutfitsFromORefit":["LS Force Naked","OBody Nude 32"],"blacklistedOutfitsFromORefitPlugin":[],"outfitsForceRefitFormID":{},"outfitsForceRefit":[],"blacklistedPresetsFromRandomDistribution":["- Zeroed Sliders -","-Zeroed Sliders-","Zeroed Sliders","HIMBO Zero for OBody"],"blacklistedPresetsShowInOBodyMenu":true}""",
-    ]
     base_dir = Path(__file__).parent.parent.resolve()
+    test_examples: list[Path] = [
+        Path(__file__).with_name("example.json"),  # src: https://www.nexusmods.com/skyrimspecialedition/articles/4756
+        base_dir / "OBody_presetDistributionConfig.json",
+    ]
     try:
         for i in test_examples:
-            OBodyConfigModel.model_validate_json(json_data=i)
+            if i.exists():
+                validate_json(i.read_bytes())
     except ValidationError as e:
         print(e)
     except Exception as e:
         print(type(e).__name__, e)
 
-    if (schema := base_dir / "OBody_presetDistributionConfig_schema.json").exists():
-        with open(schema, 'w') as f:
-            # noinspection PyRedundantParentheses
-            if using_rapidjson:  # rapidjson uses draft 4, so a workaround
-                temp = OBodyConfigModel.model_json_schema(ref_template="#/definitions/{model}")
-                temp["definitions"] = temp.pop("$defs")
-                # noinspection PyTypeChecker
-                json.dump(obj=temp, indent=2, fp=f)
-            else:
-                # noinspection PyTypeChecker
-                json.dump(obj=OBodyConfigModel.model_json_schema(), indent=2,
-                          fp=f)  # this creates a draft 2020-12 schema
-    del schema
+    schema_digest = _schema_digest(using_rapidjson)
+    schema_digest_file = Path(__file__).with_name(".schema_digest")
+    if (schema := base_dir / "OBody_presetDistributionConfig_schema.json").exists() and not (
+            schema_digest_file.exists() and schema_digest_file.read_text() == schema_digest):
+        temp = _export_schema(using_rapidjson)
+        # sorted keys keep the output stable across pydantic versions, so the checked-in schema only diffs on real changes
+        schema.write_bytes(orjson.dumps(temp, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+        schema_digest_file.write_text(schema_digest)
+    del schema, schema_digest, schema_digest_file
     if (json_file := base_dir / "OBody_presetDistributionConfig.json").exists():
-        with open(json_file, 'w') as f:
-            # noinspection PyArgumentList
-            f.write(OBodyConfigModel().model_dump_json(indent=2))
+        # noinspection PyArgumentList
+        json_file.write_bytes(orjson.dumps(OBodyConfigModel().model_dump(), option=orjson.OPT_INDENT_2))
     del json_file, base_dir
 
 
@@ -0,0 +1,65 @@
+from pathlib import Path
+from typing import Dict, List, Annotated
+
+import msgspec
+
+from OBodyPatterns import PY_EDITOR_ID, PY_FORMID, PY_NON_EMPTY, PY_NON_EMPTY_TRIMMED
+
+# read-only mirror of OBodyConfigModel: decodes and validates in a single pass inside msgspec.
+# OBodyConfigModel stays the source of truth for the schema export and the detailed validation errors
+
+type NonEmptyTrimmedString = Annotated[str, msgspec.Meta(pattern=PY_NON_EMPTY_TRIMMED)]
+type NonEmptyString = Annotated[str, msgspec.Meta(min_length=1, pattern=PY_NON_EMPTY)]
+
+type BSTFile = NonEmptyTrimmedString
+
+type FormID = Annotated[str, msgspec.Meta(min_length=3, max_length=8, pattern=PY_FORMID)]
+
+type EditorID = Annotated[str, msgspec.Meta(pattern=PY_EDITOR_ID)]
+
+type RaceName = NonEmptyTrimmedString
+
+type PresetName = NonEmptyString
+
+type NPCName = NonEmptyTrimmedString
+
+type OutfitName = NonEmptyTrimmedString
+
+type PluginFormIDs = Dict[BSTFile, List[FormID]]
+
+type PluginNames = List[BSTFile]
+
+type RaceNames = List[RaceName]
+
+
+class OBodyConfigStruct(msgspec.Struct, forbid_unknown_fields=True):
+    npcFormID: Dict[BSTFile, Dict[FormID, List[PresetName]]] = msgspec.field(default_factory=dict)
+    npc: Dict[NPCName, List[PresetName]] = msgspec.field(default_factory=dict)
+    factionFemale: Dict[EditorID, List[PresetName]] = msgspec.field(default_factory=dict)
+    factionMale: Dict[EditorID, List[PresetName]] = msgspec.field(default_factory=dict)
+    npcPluginFemale: Dict[BSTFile, List[PresetName]] = msgspec.field(default_factory=dict)
+    npcPluginMale: Dict[BSTFile, List[PresetName]] = msgspec.field(default_factory=dict)
+    raceFemale: Dict[RaceName, List[PresetName]] = msgspec.field(default_factory=dict)
+    raceMale: Dict[RaceName, List[PresetName]] = msgspec.field(default_factory=dict)
+    blacklistedNpcs: List[NPCName] = msgspec.field(default_factory=list)
+    blacklistedNpcsFormID: PluginFormIDs = msgspec.field(default_factory=dict)
+    blacklistedNpcsPluginFemale: PluginNames = msgspec.field(default_factory=list)
+    blacklistedNpcsPluginMale: PluginNames = msgspec.field(default_factory=list)
+    blacklistedRacesFemale: RaceNames = msgspec.field(default_factory=lambda: ["ElderRace"])
+    blacklistedRacesMale: RaceNames = msgspec.field(default_factory=lambda: ["ElderRace"])
+    blacklistedOutfitsFromORefitFormID: PluginFormIDs = msgspec.field(default_factory=dict)
+    blacklistedOutfitsFromORefit: List[OutfitName] = msgspec.field(
+        default_factory=lambda: ["LS Force Naked", "OBody Nude 32"])
+    blacklistedOutfitsFromORefitPlugin: PluginNames = msgspec.field(default_factory=list)
+    outfitsForceRefitFormID: PluginFormIDs = msgspec.field(default_factory=dict)
+    outfitsForceRefit: List[OutfitName] = msgspec.field(default_factory=list)
+    blacklistedPresetsFromRandomDistribution: List[PresetName] = msgspec.field(
+        default_factory=lambda: ["- Zeroed Sliders -", "-Zeroed Sliders-", "Zeroed Sliders", "HIMBO Zero for OBody"])
+    blacklistedPresetsShowInOBodyMenu: bool = True
+
+
+_DECODER = msgspec.json.Decoder(OBodyConfigStruct)
+
+
+def load_fast(path: str | Path) -> OBodyConfigStruct:
+    return _DECODER.decode(Path(path).read_bytes())
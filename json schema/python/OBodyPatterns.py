@@ -0,0 +1,21 @@
+# string patterns shared by OBodyConfigModel and OBodyConfigStruct. No imports, so the msgspec loader doesn't pull in pydantic
+
+# written for pydantic-core's Rust regex ("$" only matches at the end, \s is Unicode White_Space) and emitted into the
+# schema as-is. The plugin's std::regex tests \s per char with the locale's isspace, so it may accept e.g. U+00A0 or
+# U+3000 at the ends of a name that the model rejects
+NON_EMPTY_TRIMMED = r"^\S(?:.*\S)?$"
+NON_EMPTY = r"\S"
+FORMID = r'^[0-9A-Fa-f]{3,8}$'
+# EditorIDs are ASCII identifiers; printable ASCII minus "." keeps the character class tiny on every regex engine
+EDITOR_ID = r"^[-!-,/-~]+$"
+
+# the same patterns for Python's re (msgspec validates with re.search): "$" also matches before a trailing "\n" there,
+# so use \Z, and re's \s additionally matches \x1c-\x1f, so spell out White_Space instead
+WHITESPACE = ("\t\n\v\f\r \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+              "\u2028\u2029\u202f\u205f\u3000")
+_NOT_WS = r"[^\t-\r \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]"
+PY_NON_EMPTY_TRIMMED = rf"^{_NOT_WS}(?:.*{_NOT_WS})?\Z"
+PY_NON_EMPTY = _NOT_WS
+PY_FORMID = r'^[0-9A-Fa-f]{3,8}\Z'
+PY_EDITOR_ID = r"^[-!-,/-~]+\Z"
+
@@ -0,0 +1,147 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydantic import ValidationError
+
+import OBodyConfigModel as module
+from OBodyConfigModel import OBodyConfigModel, validate_json, validate_json_cached, validate_npcFormID
+
+EXAMPLE = Path(__file__).with_name("example.json").read_bytes()
+
+
+def test_is_listed_uses_the_blacklists():
+    config = validate_json(EXAMPLE)
+    assert config.is_listed("blacklistedNpcs", "Lydia")
+    assert not config.is_listed("blacklistedNpcs", "Mjoll the Lioness")
+    assert config.is_listed("blacklistedRacesMale", "DarkElfRace")
+
+
+def test_is_listed_sees_defaults_and_model_construct():
+    assert OBodyConfigModel().is_listed("blacklistedRacesFemale", "ElderRace")
+    assert OBodyConfigModel.model_construct(blacklistedNpcs=["Lydia"]).is_listed("blacklistedNpcs", "Lydia")
+
+
+def test_is_listed_follows_updates():
+    config = validate_json(b'{"blacklistedNpcs": ["A"]}')
+    assert config.is_listed("blacklistedNpcs", "A")
+    updated = config.model_copy(update={"blacklistedNpcs": ["B"]})
+    assert updated.is_listed("blacklistedNpcs", "B") and not updated.is_listed("blacklistedNpcs", "A")
+    assert config.is_listed("blacklistedNpcs", "A") and not config.is_listed("blacklistedNpcs", "B")
+    copied = config.model_copy(deep=True)
+    copied.blacklistedNpcs.append("C")
+    assert copied.is_listed("blacklistedNpcs", "C") and not config.is_listed("blacklistedNpcs", "C")
+    config.blacklistedNpcs = ["D"]
+    assert config.is_listed("blacklistedNpcs", "D")
+
+
+def test_is_listed_rejects_non_blacklist_fields():
+    with pytest.raises(ValueError, match="not a blacklist field"):
+        OBodyConfigModel().is_listed("npc", "Lydia")
+
+
+@pytest.mark.parametrize(("form_id", "error"), [("XYZ", "string_pattern_mismatch"), ("0x12", "string_pattern_mismatch"),
+                                                ("12", "string_too_short"), ("123456789", "string_too_long")])
+def test_formid_errors(form_id, error):
+    with pytest.raises(ValidationError) as e:
+        OBodyConfigModel(npcFormID={"Skyrim.esm": {form_id: ["Bardmaid"]}})
+    assert e.value.errors()[0]["type"] == error
+
+
+@pytest.mark.parametrize("editor_id", ["a.b", "x y", "\u00e9"])
+def test_editor_id_rejects(editor_id):
+    with pytest.raises(ValidationError) as e:
+        OBodyConfigModel(factionFemale={editor_id: ["Bardmaid"]})
+    assert e.value.errors()[0]["type"] == "string_pattern_mismatch"
+
+
+@pytest.mark.parametrize("editor_id", ["TownWhiterunFaction", "Foo-Bar_1"])
+def test_editor_id_accepts(editor_id):
+    assert OBodyConfigModel(factionFemale={editor_id: ["Bardmaid"]}).factionFemale == {editor_id: ["Bardmaid"]}
+
+
+def test_validate_json_cached_reuses_models():
+    config = validate_json_cached(EXAMPLE)
+    assert validate_json_cached(EXAMPLE) is config
+    assert validate_json_cached(EXAMPLE.decode()) is config
+    assert config == validate_json(EXAMPLE)
+
+
+def test_validate_json_cached_evicts_and_skips_errors():
+    first = validate_json_cached(b'{"npc": {"Lydia": ["first"]}}')
+    for i in range(module._VALIDATED_MAX):
+        validate_json_cached(b'{"npc": {"Lydia": ["%d"]}}' % i)
+    assert len(module._VALIDATED) == module._VALIDATED_MAX
+    assert validate_json_cached(b'{"npc": {"Lydia": ["first"]}}') is not first
+    with pytest.raises(ValidationError):
+        validate_json_cached(b'{"unknown": 1}')
+    assert len(module._VALIDATED) == module._VALIDATED_MAX
+
+
+@pytest.mark.parametrize("value", ["", " ", "x", " x", "x ", "x\n", "\nx", "\x1c", "\x1cx", "\u3000x", "\x85", "ABC",
+                                   "ABC\n", "FE000817", "0x12", "12", "123456789"])
+@pytest.mark.parametrize("wrap", [
+    lambda v: {v: {"00013BA3": ["Bardmaid"]}},  # plugin name
+    lambda v: {"Skyrim.esm": {v: ["Bardmaid"]}},  # FormID
+    lambda v: {"Skyrim.esm": {"00013BA3": [v]}},  # preset name
+], ids=["plugin", "FormID", "preset"])
+def test_validate_npcFormID_matches_model(wrap, value):
+    raw = wrap(value)
+    try:
+        OBodyConfigModel(npcFormID=raw)
+    except ValidationError:
+        with pytest.raises(ValueError):
+            validate_npcFormID(raw)
+    else:
+        assert validate_npcFormID(raw) is raw
+
+
+@pytest.mark.parametrize("raw", [{"Skyrim.esm": []}, {"Skyrim.esm": {"00013BA3": "Bardmaid"}},
+                                 {"Skyrim.esm": {"00013BA3": [1]}}, {1: {}}])
+def test_validate_npcFormID_rejects_wrong_types(raw):
+    with pytest.raises(ValueError):
+        validate_npcFormID(raw)
+
+
+def test_rapidjson_schema_keeps_annotations_next_to_refs():
+    definitions = module._export_schema(using_rapidjson=True)["definitions"]
+    # draft 4 ignores siblings of "$ref", so annotated definitions must reference through allOf
+    assert all(len(definition) == 1 for definition in definitions.values() if "$ref" in definition)
+    blacklist = definitions["blacklistedNpcsFormID"]
+    assert blacklist["allOf"] == [{"$ref": "#/definitions/PluginFormIDs"}]
+    assert blacklist["default"] == {} and blacklist["description"]
+    assert definitions["blacklistedRacesFemale"]["default"] == ["ElderRace"]
+
+
+def test_validate_json_cached_keeps_the_error_contract():
+    data = '{"npc": {"\ud800": ["x"]}}'
+    with pytest.raises(ValidationError):
+        validate_json(data)
+    with pytest.raises(ValidationError):
+        validate_json_cached(data)
+
+
+def test_main_only_regenerates_the_schema_when_inputs_change(tmp_path):
+    src = Path(__file__).parent
+    python = tmp_path / "python"
+    python.mkdir()
+    for name in ("OBodyConfigModel.py", "OBodyPatterns.py", "example.json"):
+        shutil.copy(src / name, python)
+    for name in ("OBody_presetDistributionConfig.json", "OBody_presetDistributionConfig_schema.json"):
+        shutil.copy(src.parent / name, tmp_path)
+    schema = tmp_path / "OBody_presetDistributionConfig_schema.json"
+
+    def run(using_rapidjson):
+        subprocess.run([sys.executable, "-c", f"import OBodyConfigModel; OBodyConfigModel.main({using_rapidjson})"],
+                       cwd=python, check=True)
+
+    run(True)
+    assert schema.read_bytes() == (src.parent / schema.name).read_bytes()
+    schema.write_bytes(b"{}")
+    run(True)
+    assert schema.read_bytes() == b"{}"
+    run(False)
+    assert b"$defs" in schema.read_bytes()
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import orjson
+import pytest
+
+msgspec = pytest.importorskip("msgspec")
+
+from OBodyConfigModel import OBodyConfigModel, validate_json
+from OBodyConfigStruct import _DECODER, load_fast
+
+EXAMPLE = Path(__file__).with_name("example.json")
+
+# whitespace and line-end edge cases where Python's re and pydantic-core's Rust regex disagree by default
+TRICKY = ["", " ", "x", " x", "x ", "x y", "x\n", "\nx", "x\ny", "\x1c", "\x1cx", "x\x1c", "　x", "x　", "\x85",
+          "é", "a.b", "ABC", "ABC\n", "abcdef01", "FE000817", "0x12", "12", "123456789"]
+
+
+def _model_accepts(data: dict) -> bool:
+    try:
+        validate_json(orjson.dumps(data))
+    except ValueError:
+        return False
+    return True
+
+
+def _struct_accepts(data: dict) -> bool:
+    try:
+        _DECODER.decode(orjson.dumps(data))
+    except msgspec.ValidationError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("value", TRICKY)
+@pytest.mark.parametrize("wrap", [
+    lambda v: {"npcPluginFemale": {v: []}},  # BSTFile
+    lambda v: {"blacklistedNpcsFormID": {"Skyrim.esm": [v]}},  # FormID
+    lambda v: {"factionFemale": {v: []}},  # EditorID
+    lambda v: {"blacklistedRacesMale": [v]},  # RaceName
+    lambda v: {"npc": {"Lydia": [v]}},  # PresetName
+], ids=["BSTFile", "FormID", "EditorID", "RaceName", "PresetName"])
+def test_struct_matches_model(wrap, value):
+    assert _struct_accepts(wrap(value)) == _model_accepts(wrap(value))
+
+
+def test_load_fast_matches_model():
+    config = load_fast(EXAMPLE)
+    assert msgspec.structs.asdict(config) == validate_json(EXAMPLE.read_bytes()).model_dump()
+    assert msgspec.structs.asdict(_DECODER.decode(b"{}")) == OBodyConfigModel().model_dump()
+
+
+def test_struct_module_does_not_import_pydantic():
+    code = "import sys, OBodyConfigStruct; sys.exit('pydantic' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent).returncode == 0